@@ -5,10 +5,10 @@ Main application file for document upload and chat interface
 
 import streamlit as st
 import os
+import time
 from dotenv import load_dotenv
 from document_processor import process_document
-from vector_store import VectorStore
-from openai import OpenAI
+from vector_store import VectorStore, build_filter, new_upload_batch_id
 import config
 
 # Load environment variables
@@ -33,7 +33,7 @@ if 'openai_client' not in st.session_state:
 
 
 def initialize_clients():
-    """Initialize OpenAI and Pinecone clients"""
+    """Initialize the vector store; SDK imports and index setup happen lazily"""
     try:
         openai_api_key = os.getenv('OPENAI_API_KEY')
         pinecone_api_key = os.getenv('PINECONE_API_KEY')
@@ -52,9 +52,13 @@ def initialize_clients():
                 openai_api_key=openai_api_key
             )
         
-        # Initialize OpenAI client
-        if st.session_state.openai_client is None:
-            st.session_state.openai_client = OpenAI(api_key=openai_api_key)
+        # Surface a failed background initialization; the next rerun retries it
+        init_error = st.session_state.vector_store.init_error
+        if init_error is not None:
+            st.session_state.vector_store.retry_initialization()
+            st.error(f"❌ Bağlantı hatası: {str(init_error)}")
+            st.info("🔄 Bağlantı yeniden deneniyor, sayfayı yenileyin (F5).")
+            return False
         
         return True
     except Exception as e:
@@ -62,22 +66,30 @@ def initialize_clients():
         return False
 
 
-def generate_rag_response(query: str) -> str:
+def generate_rag_response(query: str, namespace: str = None, metadata_filter: dict = None) -> str:
     """
     Generate response using enhanced RAG pipeline with reasoning
     Optimized for o1-preview model's deep analytical capabilities
     
     Args:
         query: User's question
+        namespace: Pinecone namespace (tenant partition) to search
+        metadata_filter: Pinecone metadata filter restricting the searched chunks
         
     Returns:
         AI-generated response with reasoning
     """
     try:
+        # OpenAI client is shared with the vector store and created on first use
+        if st.session_state.openai_client is None:
+            st.session_state.openai_client = st.session_state.vector_store.openai_client
+        
         # Query vector store for relevant chunks
         relevant_chunks = st.session_state.vector_store.query_vectors(
             query_text=query,
-            top_k=config.TOP_K
+            top_k=config.TOP_K,
+            namespace=namespace,
+            metadata_filter=metadata_filter
         )
         
         if not relevant_chunks:
@@ -271,6 +283,13 @@ if not initialize_clients():
 with st.sidebar:
     st.header("📄 Doküman Yönetimi")
     
+    # Namespace = tenant/department partition; uploads, search and deletion stay inside it
+    namespace = st.text_input(
+        "🏢 Çalışma alanı (namespace)",
+        value=os.getenv('PINECONE_NAMESPACE', ''),
+        help="Her departman/müşteri için ayrı bir alan kullanın. Boş = varsayılan alan."
+    )
+    
     # File uploader
     uploaded_files = st.file_uploader(
         "Dokümanları yükleyin (PDF, TXT, DOCX)",
@@ -287,6 +306,7 @@ with st.sidebar:
             status_text = st.empty()
             
             total_chunks = 0
+            upload_batch = new_upload_batch_id()
             
             for idx, file in enumerate(uploaded_files):
                 try:
@@ -303,7 +323,11 @@ with st.sidebar:
                         continue
                     
                     # Embed and store
-                    num_chunks = st.session_state.vector_store.embed_and_store(chunks)
+                    num_chunks = st.session_state.vector_store.embed_and_store(
+                        chunks,
+                        namespace=namespace,
+                        upload_batch=upload_batch
+                    )
                     total_chunks += num_chunks
                     
                     st.success(f"✅ {file.name}: {num_chunks} chunk işlendi")
@@ -334,21 +358,75 @@ Sonra sayfayı yenileyin (F5) ve tekrar deneyin.""")
     
     st.divider()
     
+    # Search filters
+    st.subheader("🔎 Arama Filtresi")
+    # Rebuilt from vector IDs in a background thread and shared across sessions,
+    # so the full ID scan never blocks a render
+    namespace_documents = None
+    if (st.session_state.vector_store.is_ready()
+            and st.session_state.vector_store.init_error is None):
+        namespace_documents = st.session_state.vector_store.get_cached_documents(namespace=namespace)
+        if namespace_documents is None:
+            if st.session_state.vector_store.is_loading_documents(namespace=namespace):
+                st.caption("⏳ Doküman listesi yükleniyor...")
+            else:
+                st.warning("⚠️ Doküman listesi alınamadı, daha sonra tekrar denenecek.")
+    namespace_documents = namespace_documents or {}
+    # Vectors stored before upload batches existed (None) can't be deleted as a batch
+    namespace_batches = {
+        batch_id: filenames for batch_id, filenames in namespace_documents.items()
+        if batch_id is not None
+    }
+    known_filenames = sorted({
+        filename for filenames in namespace_documents.values() for filename in filenames
+    })
+    selected_filenames = st.multiselect("Dosyalar", known_filenames, help="Boş = tüm dosyalar")
+    selected_types = st.multiselect("Doküman tipi", ['pdf', 'txt', 'docx'], help="Boş = tüm tipler")
+    metadata_filter = build_filter(filenames=selected_filenames, document_types=selected_types)
+    
+    st.divider()
+    
     # Statistics
     st.subheader("📊 İstatistikler")
-    try:
-        stats = st.session_state.vector_store.get_index_stats()
-        st.metric("Toplam Vector", stats['total_vectors'])
-        st.metric("İşlenen Doküman", st.session_state.documents_processed)
-    except:
+    # Don't block the first render on background index initialization
+    if st.session_state.vector_store.init_error is not None:
+        st.error(f"❌ Bağlantı hatası: {str(st.session_state.vector_store.init_error)}")
+    elif st.session_state.vector_store.is_ready():
+        try:
+            stats = st.session_state.vector_store.get_index_stats(namespace=namespace)
+            st.metric("Toplam Vector", stats['total_vectors'])
+            st.metric("İşlenen Doküman", st.session_state.documents_processed)
+        except Exception as e:
+            st.warning(f"⚠️ İstatistikler alınamadı: {str(e)}")
+    else:
         st.info("İstatistikler yükleniyor...")
     
     st.divider()
     
-    # Clear data button
+    # Delete a single upload batch
+    if namespace_batches:
+        batch_to_delete = st.selectbox(
+            "Yükleme grubu",
+            list(namespace_batches),
+            format_func=lambda batch_id: f"{batch_id} ({len(namespace_batches[batch_id])} dosya)"
+        )
+        if st.button("🧹 Seçili Yükleme Grubunu Sil"):
+            deleted = st.session_state.vector_store.delete_vectors(
+                namespace=namespace,
+                upload_batch=batch_to_delete
+            )
+            if deleted:
+                # Toasts survive the rerun that refreshes the batch list
+                st.toast(f"✅ Yükleme grubu silindi ({deleted} vector)")
+                st.rerun()
+            else:
+                st.warning("⚠️ Silinecek vector bulunamadı. Yeni yüklenen vektörler birkaç saniye "
+                           "listelenemeyebilir, biraz sonra tekrar deneyin.")
+    
+    # Clear data button (current namespace only)
     if st.button("🗑️ Tüm Verileri Temizle", type="secondary"):
         if st.session_state.vector_store:
-            st.session_state.vector_store.delete_all_vectors()
+            st.session_state.vector_store.delete_all_vectors(namespace=namespace)
             st.session_state.chat_history = []
             st.session_state.documents_processed = 0
             st.success("✅ Tüm veriler temizlendi!")
@@ -372,7 +450,7 @@ if prompt := st.chat_input("Dokümanlardaki bilgiler hakkında bir soru sorun...
     # Generate and display assistant response
     with st.chat_message("assistant"):
         with st.spinner("Düşünüyorum..."):
-            response = generate_rag_response(prompt)
+            response = generate_rag_response(prompt, namespace=namespace, metadata_filter=metadata_filter)
         st.markdown(response)
     
     # Add assistant response to chat history
@@ -389,3 +467,9 @@ if st.session_state.documents_processed == 0:
     3. Dokümanlarınız hakkında sorular sormaya başlayın!
     """)
 
+# Background index initialization and document listing finish without any user
+# interaction; rerun until they do so the stats and file filter fill in on their own
+if (not st.session_state.vector_store.is_ready()
+        or st.session_state.vector_store.is_loading_documents(namespace=namespace)):
+    time.sleep(config.UI_POLL_INTERVAL)
+    st.rerun()
@@ -0,0 +1,126 @@
+"""
+Measure ingestion memory of ChunkBatch against the legacy List[Tuple[str, dict]] chunks
+
+Two stages are measured for each representation:
+    chunking    chunk_text only
+    ingestion   chunking followed by embed_and_store, with a stub embedder
+                (distinct float objects, like the OpenAI SDK returns) and a
+                stub index that discards upserts
+
+Usage:
+    python benchmarks/chunk_memory.py [num_chars]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_processor import chunk_text
+from vector_store import VectorStore
+import config
+
+
+def legacy_chunk_text(text: str, filename: str, chunk_size: int, overlap: int) -> list:
+    """
+    Previous chunk representation: one string slice and one dict per chunk
+    """
+    chunks = []
+    start = 0
+    chunk_index = 0
+    while start < len(text):
+        chunk = text[start:start + chunk_size]
+        if chunk.strip():
+            chunks.append((chunk, {
+                'filename': filename,
+                'chunk_index': chunk_index,
+                'total_chars': len(chunk)
+            }))
+            chunk_index += 1
+        start += chunk_size - overlap
+    return chunks
+
+
+class _StubIndex:
+    """
+    Index that accepts and discards upserts
+    """
+
+    def upsert(self, vectors, namespace=None):
+        pass
+
+
+class _StubVectorStore(VectorStore):
+    """
+    VectorStore with no network access: stub embedder and stub index
+    """
+
+    def __init__(self):
+        self.index_name = 'benchmark'
+        self._api_key = None
+        self._stub_index = _StubIndex()
+        self._template = [random.random() for _ in range(config.EMBEDDING_DIMENSION)]
+
+    @property
+    def index(self):
+        return self._stub_index
+
+    def generate_embedding(self, text: str) -> list:
+        # `x + 0.0` allocates a new float per element, like a decoded API response
+        return [x + 0.0 for x in self._template]
+
+
+def measure(func, *args) -> tuple:
+    """
+    Run func and return (result, retained_bytes, peak_bytes)
+    """
+    tracemalloc.start()
+    result = func(*args)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak
+
+
+def chunk_legacy(text: str, filename: str) -> list:
+    return legacy_chunk_text(text, filename, config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+
+
+def ingest_legacy(store: VectorStore, text: str, filename: str) -> int:
+    chunks = chunk_legacy(text, filename)
+    return store.embed_and_store(chunks)
+
+
+def ingest_batch(store: VectorStore, text: str, filename: str) -> int:
+    chunks = chunk_text(text, filename)
+    return store.embed_and_store(chunks)
+
+
+def main():
+    num_chars = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    text = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (num_chars // 57 + 1))[:num_chars]
+    filename = "benchmark_document.pdf"
+    store = _StubVectorStore()
+    mb = 1024 * 1024
+
+    legacy, legacy_retained, legacy_peak = measure(chunk_legacy, text, filename)
+    del legacy
+    batch, batch_retained, batch_peak = measure(chunk_text, text, filename)
+    num_chunks = len(batch)
+    del batch
+
+    _, legacy_ingest_retained, legacy_ingest_peak = measure(ingest_legacy, store, text, filename)
+    _, batch_ingest_retained, batch_ingest_peak = measure(ingest_batch, store, text, filename)
+
+    print(f"Document: {num_chars:,} chars, {num_chunks:,} chunks, {config.EMBEDDING_DIMENSION}-dim embeddings\n")
+    print("Chunking (chunk_text):")
+    print(f"  Legacy list of tuples: retained {legacy_retained / mb:8.2f} MB, peak {legacy_peak / mb:8.2f} MB")
+    print(f"  ChunkBatch:            retained {batch_retained / mb:8.2f} MB, peak {batch_peak / mb:8.2f} MB")
+    print("Ingestion (chunk_text + embed_and_store):")
+    print(f"  Legacy list of tuples: retained {legacy_ingest_retained / mb:8.2f} MB, peak {legacy_ingest_peak / mb:8.2f} MB")
+    print(f"  ChunkBatch:            retained {batch_ingest_retained / mb:8.2f} MB, peak {batch_ingest_peak / mb:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Profile cold-start import time and VectorStore construction against a fixed budget
+
+Runs in a fresh interpreter with `-X importtime`, prints the slowest imports
+and exits non-zero if startup exceeds the budget.
+
+Usage:
+    python benchmarks/startup_profile.py [budget_seconds]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold start budget for the app's own modules (excluding Streamlit itself)
+STARTUP_BUDGET_SECONDS = 0.5
+
+# Executed in a fresh interpreter so nothing is already cached in sys.modules
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import config
+import document_processor
+import vector_store
+imported = time.perf_counter()
+vector_store.VectorStore(api_key='profile', index_name='profile', openai_api_key='profile')
+constructed = time.perf_counter()
+print(f"{imported - start:.6f} {constructed - imported:.6f}")
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse `-X importtime` output into (cumulative_us, module) pairs
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        entries.append((int(cumulative_us), module.strip()))
+    return entries
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_SECONDS
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(result.returncode)
+
+    import_seconds, construct_seconds = (float(value) for value in result.stdout.split())
+    total_seconds = import_seconds + construct_seconds
+
+    print("Slowest imports (cumulative):")
+    for cumulative_us, module in sorted(parse_importtime(result.stderr), reverse=True)[:15]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+    print()
+    print(f"Import app modules:      {import_seconds * 1000:8.1f} ms")
+    print(f"Construct VectorStore:   {construct_seconds * 1000:8.1f} ms")
+    print(f"Total:                   {total_seconds * 1000:8.1f} ms (budget {budget * 1000:.0f} ms)")
+
+    if total_seconds > budget:
+        print("❌ Cold start budget exceeded")
+        sys.exit(1)
+    print("✅ Cold start within budget")
+
+
+if __name__ == "__main__":
+    main()
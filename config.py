@@ -22,6 +22,18 @@ CHUNK_OVERLAP = 200  # Daha fazla overlap = bilgi kaybı azalır
 # Pinecone Settings - Enhanced Retrieval
 TOP_K = 8  # Daha fazla chunk = daha zengin context
 SIMILARITY_THRESHOLD = 0.25  # Minimum similarity score (0.25 = daha esnek)
+OVERFETCH_FACTOR = 2  # Pinecone'dan TOP_K * OVERFETCH_FACTOR aday çekilir
+MAX_FETCH_K = 20  # Pinecone'dan çekilecek maksimum aday sayısı
+QUERY_CONCURRENCY = 8  # Toplu sorgularda paralel Pinecone query sayısı
+EMBEDDING_BATCH_SIZE = 2048  # Tek embedding isteğindeki maksimum metin sayısı (OpenAI limiti)
+INDEX_INIT_TIMEOUT = 60  # Arka planda index hazırlanırken beklenecek maksimum süre (saniye)
+DOCUMENT_LIST_TTL = 300  # Yükleme grubu/dosya listesinin arka planda yenilenme süresi (saniye)
+UI_POLL_INTERVAL = 1  # Arka plan işlemleri sürerken arayüzün yenilenme aralığı (saniye)
+
+# Snapshot Settings - Embedding export/import (snapshot.py)
+SNAPSHOT_BATCH_SIZE = 100  # Fetch/upsert başına vector sayısı
+SNAPSHOT_UPSERT_WORKERS = 8  # Import sırasında paralel upsert sayısı
+SNAPSHOT_FETCH_WORKERS = 8  # Export sırasında paralel fetch sayısı
 
 # Chat Settings - Optimized for GPT-5
 MAX_CONTEXT_LENGTH = 8000  # GPT-5 için geniş context window
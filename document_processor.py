@@ -2,12 +2,104 @@
 Document processing module for extracting and chunking text from various file formats
 """
 
-import PyPDF2
-from docx import Document
-from typing import List, Tuple
+import re
+import sys
+from array import array
+from typing import Dict, Iterator, Tuple
 import config
 
 
+# Matches any non-whitespace character; used to skip blank chunks without slicing
+_NON_WHITESPACE = re.compile(r'\S')
+
+
+class ChunkBatch:
+    """
+    Compact, zero-copy collection of chunks from a single document
+
+    All chunks share one source string and one metadata dict; each chunk is
+    stored only as a (start, end) offset pair. Chunk text is materialized
+    on demand, e.g. right before it is sent to the embedder.
+    """
+
+    __slots__ = ('source', 'metadata', 'starts', 'ends')
+
+    def __init__(self, source: str, metadata: Dict):
+        """
+        Initialize an empty chunk batch
+
+        Args:
+            source: Full document text shared by all chunks
+            metadata: Per-document metadata shared by all chunks
+        """
+        self.source = source
+        self.metadata = {
+            key: sys.intern(value) if isinstance(value, str) else value
+            for key, value in metadata.items()
+        }
+        self.starts = array('q')
+        self.ends = array('q')
+
+    def append(self, start: int, end: int):
+        """
+        Add a chunk by its offsets into the source text
+
+        Args:
+            start: Start offset (inclusive)
+            end: End offset (exclusive)
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, i: int) -> str:
+        """
+        Materialize the text of a chunk
+
+        Args:
+            i: Chunk index (negative values count from the end)
+
+        Returns:
+            Chunk text
+
+        Raises:
+            IndexError: If i is out of range
+        """
+        i = range(len(self))[i]
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def chunk_metadata(self, i: int) -> dict:
+        """
+        Build the metadata dict of a chunk
+
+        Args:
+            i: Chunk index (negative values count from the end)
+
+        Returns:
+            New metadata dict (safe to mutate)
+
+        Raises:
+            IndexError: If i is out of range
+        """
+        i = range(len(self))[i]
+        metadata = dict(self.metadata)
+        metadata['chunk_index'] = i
+        metadata['total_chars'] = self.ends[i] - self.starts[i]
+        return metadata
+
+    def __getitem__(self, i: int) -> Tuple[str, dict]:
+        return self.text(i), self.chunk_metadata(i)
+
+    def __iter__(self) -> Iterator[Tuple[str, dict]]:
+        """
+        Lazily yield (chunk_text, metadata) tuples, one chunk at a time
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+
 def extract_text_from_pdf(file) -> str:
     """
     Extract text from a PDF file
@@ -18,6 +110,9 @@ def extract_text_from_pdf(file) -> str:
     Returns:
         Extracted text as a string
     """
+    # Imported lazily so startup doesn't pay for parsers that may never be used
+    import PyPDF2
+    
     try:
         pdf_reader = PyPDF2.PdfReader(file)
         text = ""
@@ -55,6 +150,9 @@ def extract_text_from_docx(file) -> str:
     Returns:
         Extracted text as a string
     """
+    # Imported lazily so startup doesn't pay for parsers that may never be used
+    from docx import Document
+    
     try:
         doc = Document(file)
         text_parts = []
@@ -81,6 +179,19 @@ def extract_text_from_docx(file) -> str:
         raise Exception(f"Error reading DOCX file: {str(e)}")
 
 
+def get_document_type(filename: str) -> str:
+    """
+    Get the document type (lowercase file extension) of a filename
+    
+    Args:
+        filename: Name of the file
+        
+    Returns:
+        Document type, e.g. 'pdf', 'txt' or 'docx'
+    """
+    return filename.lower().split('.')[-1]
+
+
 def extract_text(file, filename: str) -> str:
     """
     Extract text from a file based on its extension
@@ -92,7 +203,7 @@ def extract_text(file, filename: str) -> str:
     Returns:
         Extracted text as a string
     """
-    file_extension = filename.lower().split('.')[-1]
+    file_extension = get_document_type(filename)
     
     if file_extension == 'pdf':
         return extract_text_from_pdf(file)
@@ -104,7 +215,7 @@ def extract_text(file, filename: str) -> str:
         raise ValueError(f"Unsupported file format: {file_extension}")
 
 
-def chunk_text(text: str, filename: str, chunk_size: int = None, overlap: int = None) -> List[Tuple[str, dict]]:
+def chunk_text(text: str, filename: str, chunk_size: int = None, overlap: int = None) -> ChunkBatch:
     """
     Split text into overlapping chunks
     
@@ -115,37 +226,33 @@ def chunk_text(text: str, filename: str, chunk_size: int = None, overlap: int =
         overlap: Overlap between chunks in characters
         
     Returns:
-        List of tuples containing (chunk_text, metadata)
+        ChunkBatch yielding (chunk_text, metadata) tuples
     """
     if chunk_size is None:
         chunk_size = config.CHUNK_SIZE
     if overlap is None:
         overlap = config.CHUNK_OVERLAP
     
-    chunks = []
+    chunks = ChunkBatch(text, {
+        'filename': filename,
+        'document_type': get_document_type(filename)
+    })
     start = 0
-    chunk_index = 0
+    text_length = len(text)
     
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
+    while start < text_length:
+        end = min(start + chunk_size, text_length)
         
         # Only add non-empty chunks
-        if chunk.strip():
-            metadata = {
-                'filename': filename,
-                'chunk_index': chunk_index,
-                'total_chars': len(chunk)
-            }
-            chunks.append((chunk, metadata))
-            chunk_index += 1
+        if _NON_WHITESPACE.search(text, start, end):
+            chunks.append(start, end)
         
         start += chunk_size - overlap
     
     return chunks
 
 
-def process_document(file, filename: str) -> List[Tuple[str, dict]]:
+def process_document(file, filename: str) -> ChunkBatch:
     """
     Process a document: extract text and chunk it
     
@@ -154,7 +261,7 @@ def process_document(file, filename: str) -> List[Tuple[str, dict]]:
         filename: Name of the file
         
     Returns:
-        List of tuples containing (chunk_text, metadata)
+        ChunkBatch yielding (chunk_text, metadata) tuples
     """
     text = extract_text(file, filename)
     
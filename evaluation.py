@@ -0,0 +1,219 @@
+"""
+Offline retrieval evaluation: recall@k, MRR and latency across retrieval settings
+
+The evaluation set is a JSONL file with one question per line:
+    {"question": "Python bilen adaylar kimler?", "relevant": ["cv_ahmet.pdf", {"filename": "cv_ayse.pdf", "chunk_index": 2}]}
+
+A relevant entry is either a filename (any chunk of that file counts) or a
+{"filename", "chunk_index"} object for one specific chunk.
+
+Usage:
+    python evaluation.py eval_set.jsonl --top-k 4,8,12 --threshold 0.2,0.25,0.3 --overfetch 1,2,3
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+import config
+
+
+def load_eval_set(path: str) -> List[Dict]:
+    """
+    Load evaluation questions from a JSONL file
+
+    Args:
+        path: Path to the JSONL file
+
+    Returns:
+        List of {"question", "relevant"} dicts
+    """
+    with open(path, encoding='utf-8') as eval_file:
+        return [json.loads(line) for line in eval_file if line.strip()]
+
+
+def _is_relevant(match: Dict, relevant: Dict) -> bool:
+    """
+    Check whether a retrieved chunk satisfies one relevant entry
+    """
+    if isinstance(relevant, str):
+        return match['filename'] == relevant
+    return (match['filename'] == relevant['filename']
+            and match['chunk_index'] == relevant['chunk_index'])
+
+
+def score_matches(matches: List[Dict], relevant: List) -> Tuple[float, float]:
+    """
+    Compute recall and reciprocal rank for one query
+
+    Args:
+        matches: Retrieved chunks, sorted by relevance
+        relevant: Relevant entries for the query
+
+    Returns:
+        (recall, reciprocal_rank)
+    """
+    if not relevant:
+        return 0.0, 0.0
+
+    found = sum(1 for entry in relevant if any(_is_relevant(match, entry) for match in matches))
+
+    reciprocal_rank = 0.0
+    for rank, match in enumerate(matches, 1):
+        if any(_is_relevant(match, entry) for entry in relevant):
+            reciprocal_rank = 1.0 / rank
+            break
+
+    return found / len(relevant), reciprocal_rank
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty list
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))]
+
+
+def run_sweep(vector_store, eval_set: List[Dict], top_k_values: List[int],
+              threshold_values: List[float], overfetch_values: List[int],
+              namespace: str = None) -> List[Dict]:
+    """
+    Evaluate retrieval over every combination of TOP_K, SIMILARITY_THRESHOLD and over-fetch factor
+
+    Questions are embedded once with generate_embeddings and each setting is
+    queried through query_embeddings_batch, the same path as
+    query_vectors_batch. The over-fetch factor changes quality only through
+    de-duplication of identical chunk text in query_embedding: without
+    exact re-uploads in the index it affects latency alone. Results are sorted by score, so a
+    threshold only cuts a suffix; each (top_k, overfetch) pair is therefore
+    queried once and every threshold is scored from the same results.
+    Unlike the chat UI, no fallback chunks are kept when nothing passes the
+    threshold.
+
+    Args:
+        vector_store: Connected VectorStore
+        eval_set: Questions loaded with load_eval_set
+        top_k_values: TOP_K values to try
+        threshold_values: SIMILARITY_THRESHOLD values to try
+        overfetch_values: Over-fetch factors to try
+        namespace: Pinecone namespace (tenant partition) to evaluate against
+
+    Returns:
+        One result dict per setting with recall@k, MRR and latency figures
+
+    Raises:
+        ValueError: If the evaluation set or any sweep list is empty
+    """
+    if not eval_set:
+        raise ValueError("Evaluation set is empty")
+    for name, values in (('top_k', top_k_values),
+                         ('threshold', threshold_values),
+                         ('overfetch', overfetch_values)):
+        if not values:
+            raise ValueError(f"No {name} values to sweep")
+
+    questions = [item['question'] for item in eval_set]
+
+    embed_start = time.perf_counter()
+    query_embeddings = vector_store.generate_embeddings(questions)
+    embed_seconds = time.perf_counter() - embed_start
+
+    results = []
+    for overfetch_factor in overfetch_values:
+        for top_k in top_k_values:
+            latencies = []
+            wall_start = time.perf_counter()
+            responses = vector_store.query_embeddings_batch(
+                query_embeddings,
+                top_k=top_k,
+                overfetch_factor=overfetch_factor,
+                namespace=namespace,
+                latencies=latencies
+            )
+            wall_seconds = time.perf_counter() - wall_start
+
+            for threshold in threshold_values:
+                recalls = []
+                reciprocal_ranks = []
+                for item, matches in zip(eval_set, responses):
+                    kept = [match for match in matches if match['score'] >= threshold]
+                    recall, reciprocal_rank = score_matches(kept, item['relevant'])
+                    recalls.append(recall)
+                    reciprocal_ranks.append(reciprocal_rank)
+
+                results.append({
+                    'top_k': top_k,
+                    'threshold': threshold,
+                    'overfetch_factor': overfetch_factor,
+                    'recall_at_k': sum(recalls) / len(recalls),
+                    'mrr': sum(reciprocal_ranks) / len(reciprocal_ranks),
+                    'latency_p50_ms': _percentile(latencies, 50) * 1000,
+                    'latency_p95_ms': _percentile(latencies, 95) * 1000,
+                    'queries_per_second': len(questions) / wall_seconds,
+                    'embed_seconds': embed_seconds
+                })
+
+    return results
+
+
+def _parse_list(value: str, cast) -> List:
+    """
+    Parse a comma-separated CLI value into a list
+    """
+    return [cast(part) for part in value.split(',') if part.strip()]
+
+
+def main():
+    from dotenv import load_dotenv
+    from vector_store import VectorStore
+
+    parser = argparse.ArgumentParser(description="Offline retrieval evaluation")
+    parser.add_argument('eval_set', help="JSONL file with question/relevant pairs")
+    parser.add_argument('--top-k', default=str(config.TOP_K), help="Comma-separated TOP_K values")
+    parser.add_argument('--threshold', default=str(config.SIMILARITY_THRESHOLD),
+                        help="Comma-separated SIMILARITY_THRESHOLD values")
+    parser.add_argument('--overfetch', default=str(config.OVERFETCH_FACTOR),
+                        help="Comma-separated over-fetch factors")
+    parser.add_argument('--namespace', default=None, help="Pinecone namespace to evaluate against")
+    parser.add_argument('--output', help="Optional CSV file for the results")
+    args = parser.parse_args()
+
+    load_dotenv()
+    vector_store = VectorStore(
+        api_key=os.getenv('PINECONE_API_KEY'),
+        index_name=os.getenv('PINECONE_INDEX_NAME', 'rag-documents'),
+        openai_api_key=os.getenv('OPENAI_API_KEY')
+    )
+
+    eval_set = load_eval_set(args.eval_set)
+    try:
+        results = run_sweep(
+            vector_store,
+            eval_set,
+            top_k_values=_parse_list(args.top_k, int),
+            threshold_values=_parse_list(args.threshold, float),
+            overfetch_values=_parse_list(args.overfetch, int),
+            namespace=args.namespace
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"{len(eval_set)} questions, embedded in {results[0]['embed_seconds']:.2f}s\n")
+    print(f"{'top_k':>5} {'thresh':>6} {'overf':>5} {'recall@k':>9} {'MRR':>6} {'p50 ms':>7} {'p95 ms':>7} {'q/s':>7}")
+    for row in results:
+        print(f"{row['top_k']:>5} {row['threshold']:>6.2f} {row['overfetch_factor']:>5} "
+              f"{row['recall_at_k']:>9.3f} {row['mrr']:>6.3f} {row['latency_p50_ms']:>7.1f} "
+              f"{row['latency_p95_ms']:>7.1f} {row['queries_per_second']:>7.1f}")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+
+if __name__ == "__main__":
+    main()
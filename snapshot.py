@@ -0,0 +1,327 @@
+"""
+Embedding snapshot export/import for warm starts and index migrations
+
+A snapshot is a directory containing:
+    manifest.json          Vector count, dimension, dtype and embedding model
+    vectors.npy            Memory-mappable float32/float16 matrix, one row per vector
+    ids.jsonl              Vector IDs, one JSON value per line (row order)
+    metadata/<key>.jsonl   One file per metadata key, one JSON value per line (null if absent)
+
+Usage:
+    python snapshot.py export <snapshot_dir> [--dtype float16] [--namespace NAME]
+    python snapshot.py import <snapshot_dir> [--namespace NAME] [--retag-legacy]
+
+--retag-legacy migrates vectors stored before upload batches and document
+types existed: they get document_type/upload_batch metadata and
+'<upload_batch>#<filename>#<chunk_index>' IDs, so type filters and
+per-batch deletion see them.
+"""
+
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from document_processor import get_document_type
+from vector_store import parse_vector_id
+import config
+
+SNAPSHOT_FORMAT_VERSION = 1
+SUPPORTED_DTYPES = ('float32', 'float16')
+
+MANIFEST_FILE = 'manifest.json'
+VECTORS_FILE = 'vectors.npy'
+IDS_FILE = 'ids.jsonl'
+METADATA_DIR = 'metadata'
+
+# Upload batch assigned to re-tagged vectors that predate upload batches
+LEGACY_UPLOAD_BATCH = 'legacy'
+
+
+class _ColumnWriter:
+    """
+    Streams metadata into one JSONL file per key, backfilling nulls for late-appearing keys
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.files = {}
+        self.rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write_row(self, metadata: Dict):
+        for key in metadata:
+            if key not in self.files:
+                column_file = open(os.path.join(self.directory, f"{key}.jsonl"), 'w', encoding='utf-8')
+                column_file.write("null\n" * self.rows)
+                self.files[key] = column_file
+        for key, column_file in self.files.items():
+            column_file.write(json.dumps(metadata.get(key), ensure_ascii=False) + "\n")
+        self.rows += 1
+
+    def close(self):
+        for column_file in self.files.values():
+            column_file.close()
+
+
+def _read_lines(file, count: int) -> List:
+    """
+    Read the next `count` JSON values from a JSONL file
+    """
+    return [json.loads(file.readline()) for _ in range(count)]
+
+
+def _retag_legacy(vector_id: str, metadata: Dict) -> str:
+    """
+    Add missing document_type/upload_batch metadata and return the vector's new ID
+
+    Args:
+        vector_id: Original vector ID
+        metadata: Vector metadata, updated in place
+
+    Returns:
+        '<upload_batch>#<filename>#<chunk_index>' ID, or the original ID if it can't be parsed
+    """
+    filename = metadata.get('filename')
+    if filename and 'document_type' not in metadata:
+        metadata['document_type'] = get_document_type(filename)
+
+    parsed = parse_vector_id(vector_id)
+    if parsed is None or parsed[0] is not None:
+        return vector_id
+
+    _, filename, chunk_index = parsed
+    metadata.setdefault('upload_batch', LEGACY_UPLOAD_BATCH)
+    return f"{metadata['upload_batch']}#{filename}#{chunk_index}"
+
+
+def export_snapshot(vector_store, snapshot_dir: str, dtype: str = 'float32',
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    namespace: str = None) -> int:
+    """
+    Stream every vector in one namespace of the index into a snapshot directory
+
+    Args:
+        vector_store: Connected VectorStore
+        snapshot_dir: Output directory (created if missing)
+        dtype: Storage dtype for vectors, 'float32' or 'float16'
+        progress: Optional callback called with (exported, total)
+        namespace: Pinecone namespace to export (default namespace if omitted)
+
+    Returns:
+        Number of vectors exported
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported snapshot dtype: {dtype}")
+
+    index = vector_store.index
+    stats = vector_store.get_index_stats(namespace=namespace)
+    dimension = stats['dimension'] or config.EMBEDDING_DIMENSION
+
+    # IDs are streamed page by page, so the vector file is sized from the index
+    # stats; the slack absorbs vectors written while the export runs
+    expected = stats['total_vectors']
+    capacity = expected + max(1000, expected // 100)
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    vectors = np.lib.format.open_memmap(
+        os.path.join(snapshot_dir, VECTORS_FILE),
+        mode='w+',
+        dtype=dtype,
+        shape=(capacity, dimension)
+    )
+    columns = _ColumnWriter(os.path.join(snapshot_dir, METADATA_DIR))
+    row = 0
+
+    def fetch_page(page_ids: List[str]):
+        return page_ids, index.fetch(ids=page_ids, namespace=namespace).vectors
+
+    try:
+        with open(os.path.join(snapshot_dir, IDS_FILE), 'w', encoding='utf-8') as ids_file:
+
+            def write_page(page_ids: List[str], fetched: Dict):
+                nonlocal row
+                for vector_id in page_ids:
+                    # Vectors deleted after listing are skipped
+                    vector = fetched.get(vector_id)
+                    if vector is None:
+                        continue
+                    if row >= capacity:
+                        raise RuntimeError(
+                            f"Index grew past {capacity:,} vectors during export; run the export again"
+                        )
+                    vectors[row] = vector.values
+                    ids_file.write(json.dumps(vector_id, ensure_ascii=False) + "\n")
+                    columns.write_row(vector.metadata or {})
+                    row += 1
+                if progress:
+                    progress(row, expected)
+
+            # Fetch pages concurrently but write them in listing order; bound
+            # in-flight pages so memory stays flat however large the index is
+            pending = deque()
+            max_pending = config.SNAPSHOT_FETCH_WORKERS * 2
+            with ThreadPoolExecutor(max_workers=config.SNAPSHOT_FETCH_WORKERS) as executor:
+                for id_page in index.list(namespace=namespace, limit=config.SNAPSHOT_BATCH_SIZE):
+                    if len(pending) >= max_pending:
+                        write_page(*pending.popleft().result())
+                    pending.append(executor.submit(fetch_page, list(id_page)))
+
+                while pending:
+                    write_page(*pending.popleft().result())
+    finally:
+        columns.close()
+        vectors.flush()
+        del vectors
+
+    manifest = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        # Rows past `count` in vectors.npy are unused (slack and vectors deleted during export)
+        'count': row,
+        'dimension': dimension,
+        'dtype': dtype,
+        'embedding_model': config.EMBEDDING_MODEL,
+        'source_index': vector_store.index_name,
+        'source_namespace': namespace or '',
+        'columns': list(columns.files)
+    }
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    return row
+
+
+def import_snapshot(vector_store, snapshot_dir: str,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    namespace: str = None, retag_legacy: bool = False) -> int:
+    """
+    Bulk load a snapshot into the index with concurrent batched upserts
+
+    With retag_legacy, vectors that predate upload batches are stored under
+    new IDs in the 'legacy' upload batch. Import into an empty index or
+    namespace (or clear it first), otherwise the old IDs remain alongside.
+
+    Args:
+        vector_store: Connected VectorStore
+        snapshot_dir: Snapshot directory written by export_snapshot
+        progress: Optional callback called with (imported, total)
+        namespace: Pinecone namespace to import into (default namespace if omitted)
+        retag_legacy: Add missing document_type/upload_batch metadata and re-key legacy IDs
+
+    Returns:
+        Number of vectors imported
+    """
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), encoding='utf-8') as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest['format_version'] != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {manifest['format_version']}")
+    if manifest['embedding_model'] != config.EMBEDDING_MODEL:
+        raise ValueError(
+            f"Snapshot was embedded with {manifest['embedding_model']}, "
+            f"but the app is configured for {config.EMBEDDING_MODEL}"
+        )
+    index_dimension = vector_store.get_index_stats()['dimension']
+    if index_dimension and index_dimension != manifest['dimension']:
+        raise ValueError(
+            f"Snapshot dimension ({manifest['dimension']}) does not match "
+            f"index '{vector_store.index_name}' dimension ({index_dimension})"
+        )
+
+    index = vector_store.index
+    total = manifest['count']
+    vectors = np.load(os.path.join(snapshot_dir, VECTORS_FILE), mmap_mode='r')
+    ids_file = open(os.path.join(snapshot_dir, IDS_FILE), encoding='utf-8')
+    column_files = {
+        key: open(os.path.join(snapshot_dir, METADATA_DIR, f"{key}.jsonl"), encoding='utf-8')
+        for key in manifest['columns']
+    }
+
+    imported = 0
+    pending = []
+    max_pending = config.SNAPSHOT_UPSERT_WORKERS * 2
+
+    try:
+        with ThreadPoolExecutor(max_workers=config.SNAPSHOT_UPSERT_WORKERS) as executor:
+            for start in range(0, total, config.SNAPSHOT_BATCH_SIZE):
+                end = min(start + config.SNAPSHOT_BATCH_SIZE, total)
+                batch_ids = _read_lines(ids_file, end - start)
+                batch_columns = {key: _read_lines(f, end - start) for key, f in column_files.items()}
+                batch_values = np.asarray(vectors[start:end], dtype=np.float32).tolist()
+
+                batch = []
+                for i, vector_id in enumerate(batch_ids):
+                    # Pinecone rejects null metadata values, so absent keys are dropped
+                    metadata = {
+                        key: values[i] for key, values in batch_columns.items()
+                        if values[i] is not None
+                    }
+                    if retag_legacy:
+                        vector_id = _retag_legacy(vector_id, metadata)
+                    batch.append({'id': vector_id, 'values': batch_values[i], 'metadata': metadata})
+
+                # Bound in-flight batches so the whole snapshot is never materialized
+                if len(pending) >= max_pending:
+                    imported += pending.pop(0).result()
+                    if progress:
+                        progress(imported, total)
+                pending.append(executor.submit(_upsert_batch, index, batch, namespace))
+
+            for future in pending:
+                imported += future.result()
+                if progress:
+                    progress(imported, total)
+    finally:
+        ids_file.close()
+        for column_file in column_files.values():
+            column_file.close()
+
+    return imported
+
+
+def _upsert_batch(index, batch: List[Dict], namespace: str = None) -> int:
+    """
+    Upsert one batch of vectors and return its size
+    """
+    index.upsert(vectors=batch, namespace=namespace)
+    return len(batch)
+
+
+def main():
+    from dotenv import load_dotenv
+    from vector_store import VectorStore
+
+    parser = argparse.ArgumentParser(description="Export or import embedding snapshots")
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('snapshot_dir')
+    parser.add_argument('--dtype', choices=SUPPORTED_DTYPES, default='float32',
+                        help="Vector storage dtype for export")
+    parser.add_argument('--namespace', default=None, help="Pinecone namespace to export from / import into")
+    parser.add_argument('--retag-legacy', action='store_true',
+                        help="On import, add document_type/upload_batch to vectors that predate them")
+    args = parser.parse_args()
+
+    load_dotenv()
+    vector_store = VectorStore(
+        api_key=os.getenv('PINECONE_API_KEY'),
+        index_name=os.getenv('PINECONE_INDEX_NAME', 'rag-documents'),
+        openai_api_key=os.getenv('OPENAI_API_KEY')
+    )
+
+    def report(done: int, total: int):
+        print(f"\r{done:,}/{total:,} vectors", end='', flush=True)
+
+    if args.command == 'export':
+        count = export_snapshot(vector_store, args.snapshot_dir, dtype=args.dtype, progress=report,
+                                namespace=args.namespace)
+        print(f"\n✅ {count:,} vectors exported to {args.snapshot_dir}")
+    else:
+        count = import_snapshot(vector_store, args.snapshot_dir, progress=report,
+                                namespace=args.namespace, retag_legacy=args.retag_legacy)
+        print(f"\n✅ {count:,} vectors imported into {vector_store.index_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,59 +3,241 @@ Vector store module for interacting with Pinecone and OpenAI embeddings
 """
 
 import os
-from typing import List, Dict, Tuple
-from openai import OpenAI
-from pinecone import Pinecone, ServerlessSpec
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Union
+from document_processor import ChunkBatch, get_document_type
 import config
 import time
 
 
+# Index names already known to exist, shared by all VectorStore instances
+# (i.e. all Streamlit sessions) in this process: {(pinecone_api_key, index_name)}
+_known_indexes = set()
+_known_indexes_lock = threading.Lock()
+
+# list_documents results shared by all sessions in this process, loaded in the
+# background: {(pinecone_api_key, index_name, namespace): (loaded_at, {upload_batch: {filename}} or None on failure)}
+_documents_cache = {}
+_documents_loading = set()
+_documents_cache_lock = threading.Lock()
+
+
+def new_upload_batch_id() -> str:
+    """
+    Generate an ID for one upload batch (one click of the upload button)
+    
+    Returns:
+        Time-based batch ID, safe to use as a vector ID prefix
+    """
+    return time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 1_000_000:06d}"
+
+
+def parse_vector_id(vector_id: str) -> Optional[Tuple[Optional[str], str, int]]:
+    """
+    Split a vector ID into its upload batch, filename and chunk index
+    
+    Understands both '<upload_batch>#<filename>#<chunk_index>' and the
+    older '<filename>_<chunk_index>_<timestamp>' IDs (upload batch None).
+    
+    Args:
+        vector_id: Pinecone vector ID
+        
+    Returns:
+        (upload_batch, filename, chunk_index), or None for unknown ID formats
+    """
+    if '#' in vector_id:
+        upload_batch, rest = vector_id.split('#', 1)
+        filename, _, chunk_index = rest.rpartition('#')
+        if filename and chunk_index.isdigit():
+            return upload_batch, filename, int(chunk_index)
+    
+    parts = vector_id.rsplit('_', 2)
+    if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+        return None, parts[0], int(parts[1])
+    return None
+
+
+def build_filter(filenames: List[str] = None, upload_batches: List[str] = None,
+                 document_types: List[str] = None) -> Optional[Dict]:
+    """
+    Build a Pinecone metadata filter; all given conditions must match
+    
+    Args:
+        filenames: Restrict to these filenames
+        upload_batches: Restrict to these upload batch IDs
+        document_types: Restrict to these file extensions (pdf, txt, docx)
+        
+    Returns:
+        Pinecone filter dict, or None if no condition was given
+    """
+    conditions = {}
+    for field, values in (('filename', filenames),
+                          ('upload_batch', upload_batches),
+                          ('document_type', document_types)):
+        if values:
+            conditions[field] = {'$in': list(values)}
+    return conditions or None
+
+
 class VectorStore:
     """
     Handles embedding generation and vector storage/retrieval with Pinecone
+    
+    The OpenAI and Pinecone SDKs are imported lazily and the index is
+    initialized in a background thread, so construction returns immediately.
     """
     
     def __init__(self, api_key: str, index_name: str, openai_api_key: str):
         """
-        Initialize the vector store
+        Initialize the vector store and start index initialization in the background
         
         Args:
             api_key: Pinecone API key
             index_name: Name of the Pinecone index
             openai_api_key: OpenAI API key
         """
-        self.openai_client = OpenAI(api_key=openai_api_key)
         self.index_name = index_name
+        self._api_key = api_key
+        self._openai_api_key = openai_api_key
+        self._openai_client = None
+        self._openai_client_lock = threading.Lock()
         
-        # Initialize Pinecone
-        self.pc = Pinecone(api_key=api_key)
+        self.pc = None
+        self._index = None
+        self._init_error = None
+        self._index_ready = threading.Event()
+        self._init_lock = threading.Lock()
         
-        # Create or connect to index
-        self._initialize_index()
+        # Create or connect to index without blocking the caller
+        with self._init_lock:
+            self._start_initialization()
+    
+    def _start_initialization(self):
+        """
+        Start (or restart) index initialization in a background thread
+        
+        Must be called with self._init_lock held. The ready event is cleared
+        before the error is reset, so readers never see "ready, no error"
+        for an attempt that has not connected.
+        """
+        self._index_ready.clear()
+        self._init_error = None
+        threading.Thread(
+            target=self._initialize_index,
+            name=f"pinecone-init-{self.index_name}",
+            daemon=True
+        ).start()
     
     def _initialize_index(self):
         """
         Initialize Pinecone index, create if it doesn't exist
+        
+        Runs in a background thread; the outcome (handle or error) is
+        published atomically under self._init_lock together with
+        self._index_ready, and read via the index property.
         """
-        # Check if index exists
-        existing_indexes = [index.name for index in self.pc.list_indexes()]
-        
-        if self.index_name not in existing_indexes:
-            # Create new index
-            self.pc.create_index(
-                name=self.index_name,
-                dimension=config.EMBEDDING_DIMENSION,
-                metric='cosine',
-                spec=ServerlessSpec(
-                    cloud='aws',
-                    region='us-east-1'
-                )
-            )
-            # Wait for index to be ready
-            time.sleep(1)
+        index = None
+        error = None
+        try:
+            from pinecone import Pinecone, ServerlessSpec
+            
+            # Initialize Pinecone
+            self.pc = Pinecone(api_key=self._api_key)
+            
+            cache_key = (self._api_key, self.index_name)
+            with _known_indexes_lock:
+                if cache_key not in _known_indexes:
+                    # Check if index exists
+                    existing_indexes = [index.name for index in self.pc.list_indexes()]
+                    
+                    if self.index_name not in existing_indexes:
+                        # Create new index
+                        self.pc.create_index(
+                            name=self.index_name,
+                            dimension=config.EMBEDDING_DIMENSION,
+                            metric='cosine',
+                            spec=ServerlessSpec(
+                                cloud='aws',
+                                region='us-east-1'
+                            )
+                        )
+                        # Wait for index to be ready
+                        time.sleep(1)
+                    
+                    _known_indexes.add(cache_key)
+            
+            # Connect to index
+            index = self.pc.Index(self.index_name)
+        except Exception as e:
+            error = e
+        finally:
+            with self._init_lock:
+                self._index = index
+                self._init_error = error
+                self._index_ready.set()
+    
+    def is_ready(self) -> bool:
+        """
+        Check whether background index initialization has finished
+        
+        Returns:
+            True if the index is connected (or initialization failed, see init_error)
+        """
+        return self._index_ready.is_set()
+    
+    @property
+    def init_error(self) -> Optional[Exception]:
+        """
+        Error raised by the last finished initialization attempt, if any
+        """
+        return self._init_error if self._index_ready.is_set() else None
+    
+    def retry_initialization(self):
+        """
+        Restart index initialization if the last attempt failed
+        """
+        with self._init_lock:
+            if self.init_error is not None:
+                self._start_initialization()
+    
+    @property
+    def index(self):
+        """
+        Pinecone index handle, waiting for background initialization if needed
+        
+        If a previous initialization attempt failed (bad key, network error),
+        initialization is retried once before raising.
         
-        # Connect to index
-        self.index = self.pc.Index(self.index_name)
+        Raises:
+            TimeoutError: If initialization does not finish in time
+            Exception: Any error raised while initializing the index
+        """
+        self.retry_initialization()
+        deadline = time.monotonic() + config.INDEX_INIT_TIMEOUT
+        while True:
+            if not self._index_ready.wait(timeout=max(0, deadline - time.monotonic())):
+                raise TimeoutError(f"Pinecone index '{self.index_name}' was not ready after {config.INDEX_INIT_TIMEOUT}s")
+            # Read the outcome atomically; another thread may have restarted initialization meanwhile
+            with self._init_lock:
+                if self._index_ready.is_set():
+                    error, index = self._init_error, self._index
+                    break
+        if error is not None:
+            raise error
+        return index
+    
+    @property
+    def openai_client(self):
+        """
+        OpenAI client, created on first use
+        """
+        if self._openai_client is None:
+            with self._openai_client_lock:
+                if self._openai_client is None:
+                    from openai import OpenAI
+                    self._openai_client = OpenAI(api_key=self._openai_api_key)
+        return self._openai_client
     
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -73,27 +255,59 @@ class VectorStore:
         )
         return response.data[0].embedding
     
-    def embed_and_store(self, chunks: List[Tuple[str, dict]]) -> int:
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts with as few OpenAI requests as possible
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        embeddings = []
+        for start in range(0, len(texts), config.EMBEDDING_BATCH_SIZE):
+            response = self.openai_client.embeddings.create(
+                model=config.EMBEDDING_MODEL,
+                input=texts[start:start + config.EMBEDDING_BATCH_SIZE]
+            )
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda x: x.index))
+        return embeddings
+    
+    def embed_and_store(self, chunks: Union[ChunkBatch, List[Tuple[str, dict]]], namespace: str = None,
+                        upload_batch: str = None) -> int:
         """
         Generate embeddings for chunks and store in Pinecone
         
+        Chunk text is materialized one chunk at a time, so only the current
+        upsert batch holds text copies in memory. Vector IDs are prefixed with
+        the upload batch and filename so they can be deleted by ID prefix.
+        
         Args:
-            chunks: List of tuples containing (chunk_text, metadata)
+            chunks: ChunkBatch (or list) of (chunk_text, metadata) tuples
+            namespace: Pinecone namespace (tenant partition) to store into
+            upload_batch: Upload batch ID; a new one is generated if omitted
             
         Returns:
             Number of chunks stored
         """
+        if upload_batch is None:
+            upload_batch = new_upload_batch_id()
+        
         vectors_to_upsert = []
+        filenames = set()
         
-        for i, (chunk_text, metadata) in enumerate(chunks):
+        for chunk_text, metadata in chunks:
             # Generate embedding
             embedding = self.generate_embedding(chunk_text)
             
             # Create unique ID
-            vector_id = f"{metadata['filename']}_{metadata['chunk_index']}_{int(time.time())}"
+            vector_id = f"{upload_batch}#{metadata['filename']}#{metadata['chunk_index']}"
             
-            # Add chunk text to metadata for retrieval
+            # Add chunk text and upload batch to metadata for retrieval and filtering
             metadata['text'] = chunk_text
+            metadata['upload_batch'] = upload_batch
+            filenames.add(metadata['filename'])
             
             vectors_to_upsert.append({
                 'id': vector_id,
@@ -103,70 +317,343 @@ class VectorStore:
             
             # Upsert in batches of 100
             if len(vectors_to_upsert) >= 100:
-                self.index.upsert(vectors=vectors_to_upsert)
+                self.index.upsert(vectors=vectors_to_upsert, namespace=namespace)
                 vectors_to_upsert = []
         
         # Upsert remaining vectors
         if vectors_to_upsert:
-            self.index.upsert(vectors=vectors_to_upsert)
+            self.index.upsert(vectors=vectors_to_upsert, namespace=namespace)
+        
+        # Fresh IDs may not be listable yet, so record them in the document cache directly
+        with _documents_cache_lock:
+            entry = _documents_cache.get(self._documents_key(namespace))
+            if entry is not None and entry[1] is not None:
+                for filename in filenames:
+                    entry[1].setdefault(upload_batch, set()).add(filename)
         
         return len(chunks)
     
-    def query_vectors(self, query_text: str, top_k: int = None) -> List[Dict]:
+    def query_vectors(self, query_text: str, top_k: int = None, namespace: str = None,
+                      metadata_filter: Dict = None) -> List[Dict]:
         """
         Query Pinecone for similar vectors with enhanced retrieval
         
         Args:
             query_text: Query text to search for
             top_k: Number of results to return
+            namespace: Pinecone namespace (tenant partition) to search
+            metadata_filter: Pinecone metadata filter, e.g. from build_filter
             
         Returns:
             List of matching results with metadata, sorted by relevance
         """
-        if top_k is None:
-            top_k = config.TOP_K
-        
         # Generate query embedding
         query_embedding = self.generate_embedding(query_text)
         
+        return self.query_embedding(query_embedding, top_k=top_k, namespace=namespace,
+                                    metadata_filter=metadata_filter)
+    
+    def query_vectors_batch(self, query_texts: List[str], top_k: int = None,
+                            overfetch_factor: int = None, namespace: str = None,
+                            metadata_filter: Dict = None,
+                            similarity_threshold: float = None) -> List[List[Dict]]:
+        """
+        Query Pinecone for many queries: one embedding request, concurrent index queries
+        
+        Args:
+            query_texts: Query texts to search for
+            top_k: Number of results to return per query
+            overfetch_factor: Multiplier on top_k for the candidates fetched from Pinecone
+            namespace: Pinecone namespace (tenant partition) to search
+            metadata_filter: Pinecone metadata filter, e.g. from build_filter
+            similarity_threshold: Drop candidates scoring below this value
+            
+        Returns:
+            One list of matching results per query, in the same order as query_texts
+        """
+        query_embeddings = self.generate_embeddings(query_texts)
+        
+        return self.query_embeddings_batch(
+            query_embeddings,
+            top_k=top_k,
+            overfetch_factor=overfetch_factor,
+            namespace=namespace,
+            metadata_filter=metadata_filter,
+            similarity_threshold=similarity_threshold
+        )
+    
+    def query_embeddings_batch(self, query_embeddings: List[List[float]], top_k: int = None,
+                               overfetch_factor: int = None, namespace: str = None,
+                               metadata_filter: Dict = None, similarity_threshold: float = None,
+                               latencies: List[float] = None) -> List[List[Dict]]:
+        """
+        Run query_embedding for many precomputed embeddings concurrently
+        
+        Args:
+            query_embeddings: Query embedding vectors
+            top_k: Number of results to return per query
+            overfetch_factor: Multiplier on top_k for the candidates fetched from Pinecone
+            namespace: Pinecone namespace (tenant partition) to search
+            metadata_filter: Pinecone metadata filter, e.g. from build_filter
+            similarity_threshold: Drop candidates scoring below this value
+            latencies: If given, per-query latencies in seconds are appended in query order
+            
+        Returns:
+            One list of matching results per embedding, in the same order
+        """
+        def timed_query(embedding):
+            start = time.perf_counter()
+            matches = self.query_embedding(
+                embedding,
+                top_k=top_k,
+                overfetch_factor=overfetch_factor,
+                namespace=namespace,
+                metadata_filter=metadata_filter,
+                similarity_threshold=similarity_threshold
+            )
+            return matches, time.perf_counter() - start
+        
+        with ThreadPoolExecutor(max_workers=config.QUERY_CONCURRENCY) as executor:
+            responses = list(executor.map(timed_query, query_embeddings))
+        
+        if latencies is not None:
+            latencies.extend(latency for _, latency in responses)
+        return [matches for matches, _ in responses]
+    
+    def query_embedding(self, query_embedding: List[float], top_k: int = None,
+                        overfetch_factor: int = None, namespace: str = None,
+                        metadata_filter: Dict = None, similarity_threshold: float = None) -> List[Dict]:
+        """
+        Query Pinecone with a precomputed query embedding
+        
+        The namespace and metadata filter are applied by Pinecone before
+        ranking, so only the matching partition is searched. Over-fetched
+        candidates with identical chunk text (exact re-uploads of the same
+        content) are de-duplicated, keeping the best score, before truncating
+        to top_k; this is what lets a larger over-fetch factor fill top_k when
+        a document was uploaded more than once. Different documents that
+        share a filename are kept apart.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            overfetch_factor: Multiplier on top_k for the candidates fetched from Pinecone
+            namespace: Pinecone namespace (tenant partition) to search
+            metadata_filter: Pinecone metadata filter, e.g. from build_filter
+            similarity_threshold: Drop candidates scoring below this value
+            
+        Returns:
+            List of matching results with metadata, sorted by relevance
+        """
+        if top_k is None:
+            top_k = config.TOP_K
+        if overfetch_factor is None:
+            overfetch_factor = config.OVERFETCH_FACTOR
+        
         # Query Pinecone with higher top_k for better coverage
         results = self.index.query(
             vector=query_embedding,
-            top_k=min(top_k * 2, 20),  # Get more results for better filtering
-            include_metadata=True
+            top_k=max(top_k, min(top_k * overfetch_factor, config.MAX_FETCH_K)),  # Get more results for better filtering
+            include_metadata=True,
+            namespace=namespace,
+            filter=metadata_filter
         )
         
-        # Extract and return results
+        # Sort by score (descending) so the first copy of a duplicate is the best one
+        candidates = sorted(results.matches, key=lambda match: match.score, reverse=True)
+        
+        # Extract, de-duplicate and filter over the whole candidate set, then truncate
         matches = []
-        for match in results.matches:
+        seen = set()
+        for match in candidates:
+            if similarity_threshold is not None and match.score < similarity_threshold:
+                break
+            text = match.metadata.get('text', '')
+            # Chunks without stored text can't be compared, so they are never merged
+            if text:
+                if text in seen:
+                    continue
+                seen.add(text)
             matches.append({
-                'text': match.metadata.get('text', ''),
+                'text': text,
                 'filename': match.metadata.get('filename', ''),
                 'score': match.score,
                 'chunk_index': match.metadata.get('chunk_index', 0)
             })
+            if len(matches) == top_k:
+                break
         
-        # Sort by score (descending) and return top_k
-        matches.sort(key=lambda x: x['score'], reverse=True)
-        
-        return matches[:top_k]
+        return matches
     
-    def get_index_stats(self) -> Dict:
+    def get_index_stats(self, namespace: str = None) -> Dict:
         """
         Get statistics about the current index
         
+        Args:
+            namespace: Pinecone namespace (tenant partition); None is the default namespace
+            
         Returns:
-            Dictionary containing index statistics
+            Dictionary with the namespace's vector count ('total_vectors'), the
+            count across all namespaces ('index_total_vectors') and the dimension
         """
         stats = self.index.describe_index_stats()
+        namespace_stats = stats.namespaces.get(namespace or '')
         return {
-            'total_vectors': stats.total_vector_count,
+            'total_vectors': namespace_stats.vector_count if namespace_stats else 0,
+            'index_total_vectors': stats.total_vector_count,
             'dimension': stats.dimension
         }
     
-    def delete_all_vectors(self):
+    def _documents_key(self, namespace: str = None) -> Tuple[str, str, str]:
+        return self._api_key, self.index_name, namespace or ''
+    
+    def list_documents(self, namespace: str = None) -> Dict[Optional[str], List[str]]:
+        """
+        List the upload batches and filenames stored in one namespace
+        
+        Reads vector IDs only (no vectors or metadata), but pages through
+        every ID in the namespace; use get_cached_documents on the UI path.
+        Vectors stored before upload batches existed are grouped under None.
+        
+        Args:
+            namespace: Pinecone namespace (tenant partition); None is the default namespace
+            
+        Returns:
+            Mapping of upload batch ID (or None) to sorted filenames
+        """
+        documents = {}
+        for id_page in self.index.list(namespace=namespace):
+            for vector_id in id_page:
+                parsed = parse_vector_id(vector_id)
+                if parsed is not None:
+                    upload_batch, filename, _ = parsed
+                    documents.setdefault(upload_batch, set()).add(filename)
+        return {upload_batch: sorted(filenames) for upload_batch, filenames in documents.items()}
+    
+    def get_cached_documents(self, namespace: str = None) -> Optional[Dict[Optional[str], List[str]]]:
+        """
+        Non-blocking list_documents backed by a process-wide cache
+        
+        A missing or expired (config.DOCUMENT_LIST_TTL) entry is reloaded in a
+        background thread; an expired entry is still returned meanwhile.
+        
+        Args:
+            namespace: Pinecone namespace (tenant partition); None is the default namespace
+            
+        Returns:
+            Mapping of upload batch ID (or None) to sorted filenames, or None
+            while the first load is running or if it failed
+        """
+        key = self._documents_key(namespace)
+        with _documents_cache_lock:
+            entry = _documents_cache.get(key)
+            expired = entry is None or time.monotonic() - entry[0] > config.DOCUMENT_LIST_TTL
+            if expired and key not in _documents_loading:
+                _documents_loading.add(key)
+                threading.Thread(
+                    target=self._load_documents,
+                    args=(namespace,),
+                    name=f"pinecone-list-{self.index_name}",
+                    daemon=True
+                ).start()
+            if entry is None or entry[1] is None:
+                return None
+            return {upload_batch: sorted(filenames) for upload_batch, filenames in entry[1].items()}
+    
+    def is_loading_documents(self, namespace: str = None) -> bool:
         """
-        Delete all vectors from the index
+        Check whether the document list of a namespace is being loaded in the background
         """
-        self.index.delete(delete_all=True)
-
+        with _documents_cache_lock:
+            return self._documents_key(namespace) in _documents_loading
+    
+    def _load_documents(self, namespace: str = None):
+        """
+        Background target of get_cached_documents; failures are cached until the TTL expires
+        """
+        key = self._documents_key(namespace)
+        try:
+            documents = {
+                upload_batch: set(filenames)
+                for upload_batch, filenames in self.list_documents(namespace=namespace).items()
+            }
+        except Exception:
+            documents = None
+        with _documents_cache_lock:
+            _documents_cache[key] = (time.monotonic(), documents)
+            _documents_loading.discard(key)
+    
+    def delete_vectors(self, namespace: str = None, upload_batch: str = None,
+                       filename: str = None, document_type: str = None) -> Optional[int]:
+        """
+        Delete vectors from one namespace, optionally scoped by upload batch, file and/or document type
+        
+        Matching vectors are found by listing and parsing IDs, which works on
+        serverless indexes without fetching metadata. With an upload batch only
+        that batch's ID prefix is listed; otherwise every ID in the namespace
+        is listed. Vectors upserted moments ago may not be listable yet.
+        
+        Args:
+            namespace: Pinecone namespace (tenant partition); None is the default namespace
+            upload_batch: Delete only vectors from this upload batch
+            filename: Delete only vectors from this file
+            document_type: Delete only vectors of this document type (pdf, txt, docx)
+            
+        Returns:
+            Number of deleted vectors, or None if the whole namespace was cleared
+        """
+        key = self._documents_key(namespace)
+        
+        if upload_batch is None and filename is None and document_type is None:
+            self.index.delete(delete_all=True, namespace=namespace)
+            with _documents_cache_lock:
+                _documents_cache[key] = (time.monotonic(), {})
+            return None
+        
+        prefix = f"{upload_batch}#" if upload_batch is not None else None
+        ids_to_delete = []
+        deleted_documents = set()
+        for id_page in self.index.list(prefix=prefix, namespace=namespace):
+            for vector_id in id_page:
+                parsed = parse_vector_id(vector_id)
+                if parsed is None:
+                    continue
+                if upload_batch is not None and parsed[0] != upload_batch:
+                    continue
+                if filename is not None and parsed[1] != filename:
+                    continue
+                if document_type is not None and get_document_type(parsed[1]) != document_type:
+                    continue
+                ids_to_delete.append(vector_id)
+                deleted_documents.add(parsed[:2])
+        
+        # Delete after listing so pagination isn't affected; Pinecone accepts up to 1000 IDs per call
+        for start in range(0, len(ids_to_delete), 1000):
+            self.index.delete(ids=ids_to_delete[start:start + 1000], namespace=namespace)
+        
+        with _documents_cache_lock:
+            entry = _documents_cache.get(key)
+            if entry is not None and entry[1] is not None:
+                for deleted_batch, deleted_filename in deleted_documents:
+                    filenames = entry[1].get(deleted_batch)
+                    if filenames is not None:
+                        filenames.discard(deleted_filename)
+                        if not filenames:
+                            del entry[1][deleted_batch]
+        
+        return len(ids_to_delete)
+    
+    def delete_all_vectors(self, namespace: str = None, all_namespaces: bool = False):
+        """
+        Delete all vectors in one namespace, or in every namespace of the index
+        
+        Args:
+            namespace: Pinecone namespace (tenant partition); None is the default namespace
+            all_namespaces: Ignore namespace and clear every namespace in the index
+        """
+        if not all_namespaces:
+            self.delete_vectors(namespace=namespace)
+            return
+        
+        for name in self.index.describe_index_stats().namespaces:
+            self.delete_vectors(namespace=name)